@@ -4,12 +4,12 @@
 # requires-python = ">=3.12"
 # dependencies = [
 #   "packaging",
-#   "gspread",
 #   "google-auth",
 #   "google-api-python-client", 
 #   "tenacity",
 #   "gcsfs",
-#   "click"
+#   "click",
+#   "orjson"
 # ]
 # ///
 
@@ -23,29 +23,33 @@ Usage:
   dataset-sync.py --dataset song-sheets -o /local/path/data.jsonl -o gs://bucket/path/data.jsonl
 """
 
+import base64
 import datetime
-import json
+import functools
+import hashlib
 import os
+import re
 import sys
 import uuid
-import io
 import pathlib
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 
 import click
-import gspread
+import orjson
 import google.auth
 from google.auth import impersonated_credentials
+from google.auth.transport.requests import Request as AuthRequest
+from google.oauth2 import credentials as oauth2_credentials
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
 import gcsfs
 
-from gspread.exceptions import APIError
-
 
 def is_rate_limit_error(exception):
     """Check if exception is a rate limit error that should be retried."""
-    return isinstance(exception, APIError) and exception.response.status_code == 429
+    return isinstance(exception, HttpError) and exception.resp.status == 429
 
 
 retry_on_rate_limit = retry(
@@ -71,77 +75,152 @@ class OutputWriter:
     def _get_gcs_fs(self):
         """Lazy initialize GCS filesystem."""
         if self.fs is None:
-            self.fs = gcsfs.GCSFileSystem(**self._fs_kwargs)
+            # 16 MiB blocks: fewer HTTP range requests per MB transferred.
+            self.fs = gcsfs.GCSFileSystem(
+                default_block_size=16 * 1024 * 1024, **self._fs_kwargs
+            )
         return self.fs
     
-    def write_content(self, content: str, output_path: str) -> None:
-        """Write content to the specified output path (GCS or local)."""
+    def write_content(self, content: bytes, output_path: str) -> None:
+        """Write content bytes to the specified output path (GCS or local)."""
         if output_path.startswith("gs://"):
-            # GCS path
+            # GCS path: pipe_file uploads the payload in one PUT, without the
+            # intermediate buffer that fs.open(..., "w") maintains. Tagging
+            # the object as NDJSON lets downstream readers skip sniffing.
             gcs_path = output_path[5:]  # Remove gs:// prefix
             fs = self._get_gcs_fs()
-            with fs.open(gcs_path, "w") as f:
-                f.write(content)
+            fs.pipe_file(gcs_path, content, content_type="application/x-ndjson")
             print(f"Wrote {len(content.splitlines())} lines to {output_path}")
         else:
             # Local path
             path = pathlib.Path(output_path)
             path.parent.mkdir(parents=True, exist_ok=True)
-            with open(path, "w") as f:
+            with open(path, "wb") as f:
                 f.write(content)
             print(f"Wrote {len(content.splitlines())} lines to {output_path}")
     
-    def read_content(self, path: str) -> Optional[str]:
-        """Read content from a path for comparison. Returns None if file doesn't exist."""
+    def remote_md5(self, path: str) -> Optional[bytes]:
+        """Fetch the md5 digest of a GCS object from its metadata.
+
+        Returns None if the object doesn't exist or exposes no md5 (e.g.
+        composite objects). This is an O(1) metadata request, vs. downloading
+        the whole object for a content comparison.
+        """
         try:
-            if path.startswith("gs://"):
-                gcs_path = path[5:]  # Remove gs:// prefix
-                fs = self._get_gcs_fs()
-                if not fs.exists(gcs_path):
-                    return None
-                with fs.open(gcs_path, "r") as f:
-                    return f.read()
-            else:
-                if not os.path.exists(path):
-                    return None
-                with open(path, "r") as f:
-                    return f.read()
+            info = self._get_gcs_fs().info(path[5:])
+        except FileNotFoundError:
+            return None
         except Exception as e:
+            # A transient metadata failure (5xx, auth hiccup) must not abort
+            # the sync; treat the destination as changed and fall through to
+            # writing, like local_md5 does on read errors.
+            print(f"WARNING: Could not fetch metadata for {path}: {e}", file=sys.stderr)
+            return None
+        md5_hash = info.get("md5Hash")
+        if not md5_hash:
+            return None
+        return base64.b64decode(md5_hash)
+
+    def copy_content(self, src_path: str, dst_path: str) -> None:
+        """Server-side copy between two GCS paths, avoiding a re-upload."""
+        fs = self._get_gcs_fs()
+        fs.cp(src_path[5:], dst_path[5:])
+        print(f"Copied {src_path} to {dst_path} (server-side)")
+
+    def local_md5(self, path: str) -> Optional[bytes]:
+        """md5 of a local file, hashed in chunks so it is never fully in memory.
+
+        Returns None if the file doesn't exist or can't be read.
+        """
+        if not os.path.exists(path):
+            return None
+        digest = hashlib.md5()
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        except OSError as e:
             print(f"WARNING: Could not read {path} for comparison: {e}", file=sys.stderr)
             return None
+        return digest.digest()
 
 
-def transform_to_session(spreadsheet_name: str, worksheet_title: str, values: list) -> Optional[Dict[str, Any]]:
-    """Transform spreadsheet data into a jam session object."""
+# One timestamp per run: cheaper than a clock read per session and makes
+# ingested_at consistent across a single ingestion batch.
+_INGEST_TS = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+# Namespace for deterministic session IDs. uuid5 over (sheet, date) avoids a
+# urandom read per session and makes re-ingestion idempotent: the same jam
+# session always yields the same session_id, so downstream consumers can
+# treat it as a stable primary key for upserts.
+_SESSION_ID_NAMESPACE = uuid.UUID("00000000-0000-0000-0000-000000000001")
+
+# Worksheet titles encode the session date as YYYY/MM/DD. A precompiled regex
+# is several times faster than strptime for this fixed shape. Month and day
+# accept one or two digits: tab names are hand-typed and strptime's %m/%d
+# tolerated unpadded values like 2024/3/5.
+_WORKSHEET_DATE_RE = re.compile(r"(\d{4})/(\d{1,2})/(\d{1,2})")
+
+# Recognized "Requested By" codes; anything else is recorded as null.
+_VALID_REQUEST_CODES = frozenset({"A", "G", "O"})
+
+
+def _column_index(header: list, name: str) -> int:
+    """Index of a column in the header row, or -1 if absent."""
     try:
-        session_date = datetime.datetime.strptime(worksheet_title, "%Y/%m/%d").date()
+        return header.index(name)
     except ValueError:
+        return -1
+
+
+def _cell(row_values: list, idx: int) -> str:
+    """Stripped cell value at idx, tolerating short rows and missing columns."""
+    if 0 <= idx < len(row_values):
+        return row_values[idx].strip()
+    return ""
+
+
+def transform_to_session(spreadsheet_name: str, worksheet_title: str, values: list) -> Optional[Dict[str, Any]]:
+    """Transform spreadsheet data into a jam session object."""
+    session_date = None
+    match = _WORKSHEET_DATE_RE.fullmatch(worksheet_title)
+    if match:
+        try:
+            session_date = datetime.date(int(match[1]), int(match[2]), int(match[3]))
+        except ValueError:
+            pass  # Matched the shape but isn't a real date (e.g. month 13)
+    if session_date is None:
         print(f"Skipping worksheet with invalid date format title: {worksheet_title}")
         return None
 
     if not values or len(values) < 2:
         return None  # No data or header only
 
+    # Resolve column positions once; the row loop then indexes directly
+    # instead of building a padded row and a fresh dict per row.
     header = values[0]
+    page_idx = _column_index(header, "Page")
+    song_idx = _column_index(header, "Song")
+    artist_idx = _column_index(header, "Artist")
+    requested_by_idx = _column_index(header, "Requested By")
 
     session = {
-        "session_id": str(uuid.uuid4()),
+        "session_id": str(
+            uuid.uuid5(_SESSION_ID_NAMESPACE, f"{spreadsheet_name}|{session_date.isoformat()}")
+        ),
         "date": session_date.isoformat(),
         "venue": None,
         "source_sheet": spreadsheet_name,
-        "ingested_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "ingested_at": _INGEST_TS,
         "events": [],
     }
     position = 1
     break_found = False
 
     for row_values in values[1:]:
-        padded_row = row_values + [""] * (len(header) - len(row_values))
-        row_dict = dict(zip(header, padded_row))
-
-        page = row_dict.get("Page", "").strip()
-        song = row_dict.get("Song", "").strip()
-        artist = row_dict.get("Artist", "").strip()
+        page = _cell(row_values, page_idx)
+        song = _cell(row_values, song_idx)
+        artist = _cell(row_values, artist_idx)
 
         if not page and not song and not artist:
             if not break_found:
@@ -153,8 +232,8 @@ def transform_to_session(spreadsheet_name: str, worksheet_title: str, values: li
                 break
             continue
 
-        requested_by = row_dict.get("Requested By", "").strip() or None
-        if requested_by not in ["A", "G", "O"]:
+        requested_by = _cell(row_values, requested_by_idx)
+        if requested_by not in _VALID_REQUEST_CODES:
             requested_by = None
 
         event = {
@@ -173,32 +252,116 @@ def transform_to_session(spreadsheet_name: str, worksheet_title: str, values: li
 
 @retry_on_rate_limit
 def get_spreadsheets(drive_service, folder_id):
-    """Get all spreadsheets in a Google Drive folder."""
+    """Get all spreadsheets in a Google Drive folder, following page tokens."""
     query = f"'{folder_id}' in parents and mimeType='application/vnd.google-apps.spreadsheet'"
-    response = (
-        drive_service.files()
-        .list(q=query, fields="files(id, name)", supportsAllDrives=True, includeItemsFromAllDrives=True)
-        .execute()
-    )
-    return response.get("files", [])
+    spreadsheets = []
+    page_token = None
+    while True:
+        response = (
+            drive_service.files()
+            .list(
+                q=query,
+                fields="nextPageToken, files(id, name)",
+                orderBy="name",
+                pageSize=1000,
+                pageToken=page_token,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True,
+            )
+            .execute()
+        )
+        spreadsheets.extend(response.get("files", []))
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return spreadsheets
 
 
-@retry_on_rate_limit  
-def get_worksheet_data(sh):
-    """Get data from all worksheets except the first one."""
-    worksheets_to_process = sh.worksheets()[1:]
-    if not worksheets_to_process:
+@retry_on_rate_limit
+def get_worksheet_data(sheets_service, spreadsheet_id: str):
+    """Get data from all worksheets except the first one.
+
+    Two RPCs per spreadsheet: one spreadsheets.get restricted to worksheet
+    titles, and one values.batchGet covering every worksheet's A:D range.
+    """
+    metadata = (
+        sheets_service.spreadsheets()
+        .get(spreadsheetId=spreadsheet_id, fields="sheets.properties.title")
+        .execute()
+    )
+    titles = [s["properties"]["title"] for s in metadata.get("sheets", [])[1:]]
+    if not titles:
         return None, None
 
-    ranges = [f"'{w.title}'!A:D" for w in worksheets_to_process]
-    batch_get_result = sh.values_batch_get(ranges)
+    ranges = [f"'{title}'!A:D" for title in titles]
+    batch_get_result = (
+        sheets_service.spreadsheets()
+        .values()
+        .batchGet(spreadsheetId=spreadsheet_id, ranges=ranges, majorDimension="ROWS")
+        .execute()
+    )
     value_ranges = batch_get_result.get("valueRanges", [])
-    return worksheets_to_process, value_ranges
+    return titles, value_ranges
+
+
+TOKEN_CACHE_DIR = pathlib.Path.home() / ".cache" / "ut-datasets"
+
+
+def _load_cached_token(cache_path: pathlib.Path) -> Optional[google.auth.credentials.Credentials]:
+    """Load a previously cached access token if it is still valid."""
+    try:
+        cached = orjson.loads(cache_path.read_bytes())
+        expiry = datetime.datetime.fromisoformat(cached["expiry"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+    # Leave a 60s safety margin so a nearly-expired token isn't reused.
+    if expiry - datetime.timedelta(seconds=60) <= datetime.datetime.now(datetime.timezone.utc):
+        return None
+    return oauth2_credentials.Credentials(token=cached["token"])
+
+
+def _store_cached_token(cache_path: pathlib.Path, creds: google.auth.credentials.Credentials) -> None:
+    """Persist an access token + expiry for reuse by later invocations."""
+    if not creds.token or not creds.expiry:
+        return
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    expiry = creds.expiry
+    if expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=datetime.timezone.utc)
+    payload = orjson.dumps({"token": creds.token, "expiry": expiry.isoformat()})
+    # Tokens are secrets: create the cache file owner-readable only.
+    fd = os.open(cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(payload)
 
 
 def get_google_credentials(scopes: List[str]) -> google.auth.credentials.Credentials:
-    """Get Google credentials, impersonating if SERVICE_ACCOUNT_EMAIL is set."""
-    target_principal = os.getenv("SERVICE_ACCOUNT_EMAIL")
+    """Get Google credentials, impersonating if SERVICE_ACCOUNT_EMAIL is set.
+
+    The resulting access token is cached on disk (keyed by scopes and target
+    principal) so short-lived invocations within the token lifetime skip the
+    auth/IAM token-exchange round-trips. Within one process the credentials
+    object itself is memoized, so embedding callers (e.g. a long-lived server
+    importing this module) never repeat the auth flow per call.
+    """
+    return _get_google_credentials_cached(
+        os.getenv("SERVICE_ACCOUNT_EMAIL"), tuple(scopes)
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _get_google_credentials_cached(
+    target_principal: Optional[str], scopes: tuple
+) -> google.auth.credentials.Credentials:
+    cache_key = hashlib.sha256(
+        "|".join([target_principal or ""] + sorted(scopes)).encode()
+    ).hexdigest()[:16]
+    cache_path = TOKEN_CACHE_DIR / f"token-{cache_key}.json"
+
+    cached_creds = _load_cached_token(cache_path)
+    if cached_creds is not None:
+        return cached_creds
+
     creds, _ = google.auth.default(scopes=scopes)
 
     if target_principal:
@@ -208,9 +371,70 @@ def get_google_credentials(scopes: List[str]) -> google.auth.credentials.Credent
             target_principal=target_principal,
             target_scopes=scopes,
         )
+
+    try:
+        creds.refresh(AuthRequest())
+        _store_cached_token(cache_path, creds)
+    except Exception as e:
+        # Caching is best-effort; the credentials object still works without it.
+        print(f"WARNING: Could not cache access token: {e}", file=sys.stderr)
     return creds
 
 
+def process_spreadsheet(creds, spreadsheet: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Fetch a single spreadsheet's worksheets and transform them into sessions."""
+    # httplib2 is not thread-safe, so each worker builds its own service.
+    sheets_service = get_sheets_service(creds)
+
+    # Process all worksheets except the first one (index 0)
+    worksheet_titles, value_ranges = get_worksheet_data(sheets_service, spreadsheet["id"])
+    if not worksheet_titles:
+        return []
+
+    # values.batchGet returns one valueRange per requested range, in request
+    # order, so the results pair up with the titles directly.
+    sessions = []
+    for title, value_range in zip(worksheet_titles, value_ranges):
+        worksheet_values = value_range.get("values")
+
+        if worksheet_values:
+            session_data = transform_to_session(
+                spreadsheet["name"], title, worksheet_values
+            )
+            if session_data:
+                sessions.append(session_data)
+
+    return sessions
+
+
+def get_drive_service(creds):
+    """Build a Drive v3 service with a single pooled, authorized HTTP client.
+
+    The service (and its underlying keep-alive connection) is meant to be
+    reused across all calls in a run rather than rebuilt per request.
+    static_discovery=True serves the discovery document from the bundled
+    copy in google-api-python-client, so no discovery fetch ever happens.
+    """
+    return build(
+        "drive",
+        "v3",
+        credentials=creds,
+        cache_discovery=False,
+        static_discovery=True,
+    )
+
+
+def get_sheets_service(creds):
+    """Build a Sheets v4 service; see get_drive_service for the build flags."""
+    return build(
+        "sheets",
+        "v4",
+        credentials=creds,
+        cache_discovery=False,
+        static_discovery=True,
+    )
+
+
 def fetch_jam_sessions_data() -> List[Dict[str, Any]]:
     """Fetch jam session data from Google Sheets."""
     scopes = [
@@ -219,33 +443,19 @@ def fetch_jam_sessions_data() -> List[Dict[str, Any]]:
     ]
     creds = get_google_credentials(scopes)
 
-    gc = gspread.authorize(creds)
-    drive_service = build("drive", "v3", credentials=creds)
+    drive_service = get_drive_service(creds)
 
     folder_id = "1TY4KCBrbHODyCKCtWXgtNlCHs2-8Svpd"
     spreadsheets = get_spreadsheets(drive_service, folder_id)
 
+    # Spreadsheet fetches are network-bound, so process them concurrently.
+    # executor.map preserves input order, keeping the output deterministic.
     all_sessions = []
-    for spreadsheet in spreadsheets:
-        sh = gc.open_by_key(spreadsheet["id"])
-
-        # Process all worksheets except the first one (index 0)
-        worksheets_to_process, value_ranges = get_worksheet_data(sh)
-        if not worksheets_to_process:
-            continue
-
-        # Map range data back to worksheets
-        range_data_map = {item["range"]: item.get("values", []) for item in value_ranges}
-
-        for i, worksheet in enumerate(worksheets_to_process):
-            worksheet_values = range_data_map.get(value_ranges[i]["range"])
-
-            if worksheet_values:
-                session_data = transform_to_session(
-                    spreadsheet["name"], worksheet.title, worksheet_values
-                )
-                if session_data:
-                    all_sessions.append(session_data)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for sessions in executor.map(
+            lambda s: process_spreadsheet(creds, s), spreadsheets
+        ):
+            all_sessions.extend(sessions)
 
     return all_sessions
 
@@ -261,12 +471,14 @@ def fetch_song_sheets_data() -> List[Dict[str, Any]]:
     if requester_pays_project:
         fs_kwargs = {"requester_pays": True, "project": requester_pays_project}
 
-    fs = gcsfs.GCSFileSystem(**fs_kwargs)
+    fs = gcsfs.GCSFileSystem(default_block_size=16 * 1024 * 1024, **fs_kwargs)
 
     # List all .pdf files from source
     src_base = f"{src_bucket}/{src_prefix}".rstrip("/")
     try:
-        paths = fs.ls(src_base)
+        # detail=False returns plain path strings, skipping per-entry
+        # metadata dict construction for large listings.
+        paths = fs.ls(src_base, detail=False)
     except Exception as e:
         print(f"ERROR: failed to list gs://{src_base}: {e}", file=sys.stderr)
         raise
@@ -279,34 +491,80 @@ def fetch_song_sheets_data() -> List[Dict[str, Any]]:
     scopes = ["https://www.googleapis.com/auth/drive.readonly"]
     creds = get_google_credentials(scopes)
 
-    drive_service = build("drive", "v3", credentials=creds)
-    
     pdf_file_ids = {pathlib.Path(p).stem for p in pdf_files}
 
-    # Fetch all Google Docs from the folder and filter by PDF file IDs
-    folder_ids = ["1b_ZuZVOGgvkKVSUypkbRwBsXLVQGjl95", "1bvrIMQXjAxepzn4Vx8wEjhk3eQS5a9BM"]
-    all_drive_files = []
-    for folder_id in folder_ids:
-        query = f"'{folder_id}' in parents and mimeType='application/vnd.google-apps.document'"
-        page_token = None
-        while True:
+    def folder_query(folder_id: str) -> str:
+        return f"'{folder_id}' in parents and mimeType='application/vnd.google-apps.document'"
+
+    def list_remaining_pages(folder_id: str, page_token: str) -> List[Dict[str, Any]]:
+        """Follow a folder's page tokens after its first page was fetched."""
+        # httplib2 is not thread-safe, so each worker builds its own service.
+        drive_service = get_drive_service(creds)
+        files = []
+        while page_token:
             try:
                 response = drive_service.files().list(
-                    q=query,
+                    q=folder_query(folder_id),
                     fields="nextPageToken, files(id, name, properties)",
+                    orderBy="name",
+                    pageSize=1000,
                     pageToken=page_token,
                     supportsAllDrives=True,
                     includeItemsFromAllDrives=True
                 ).execute()
-                all_drive_files.extend(response.get("files", []))
+                files.extend(response.get("files", []))
                 page_token = response.get("nextPageToken")
-                if not page_token:
-                    break
             except Exception as e:
                 print(f"ERROR: Failed to list files from Google Drive folder '{folder_id}': {e}", file=sys.stderr)
                 # Decide if you want to raise or continue
                 break
-        
+        return files
+
+    # Fetch all Google Docs from the folders and filter by PDF file IDs.
+    # The first page of every folder is requested in a single batched HTTP
+    # round-trip; only folders that overflow one page need further requests,
+    # which are issued in parallel.
+    folder_ids = ["1b_ZuZVOGgvkKVSUypkbRwBsXLVQGjl95", "1bvrIMQXjAxepzn4Vx8wEjhk3eQS5a9BM"]
+    first_pages: Dict[str, Dict[str, Any]] = {}
+
+    def on_first_page(request_id, response, exception):
+        if exception is not None:
+            print(f"ERROR: Failed to list files from Google Drive folder '{request_id}': {exception}", file=sys.stderr)
+            return
+        first_pages[request_id] = response
+
+    drive_service = get_drive_service(creds)
+    batch = drive_service.new_batch_http_request(callback=on_first_page)
+    for folder_id in folder_ids:
+        batch.add(
+            drive_service.files().list(
+                q=folder_query(folder_id),
+                fields="nextPageToken, files(id, name, properties)",
+                orderBy="name",
+                pageSize=1000,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True
+            ),
+            request_id=folder_id,
+        )
+    batch.execute()
+
+    all_drive_files = []
+    continuations = []
+    for folder_id in folder_ids:
+        response = first_pages.get(folder_id)
+        if not response:
+            continue
+        all_drive_files.extend(response.get("files", []))
+        page_token = response.get("nextPageToken")
+        if page_token:
+            continuations.append((folder_id, page_token))
+
+    if continuations:
+        with ThreadPoolExecutor(max_workers=min(8, len(continuations))) as executor:
+            for files in executor.map(lambda args: list_remaining_pages(*args), continuations):
+                all_drive_files.extend(files)
+
     all_data = []
     for file_data in all_drive_files:
         if file_data['id'] in pdf_file_ids:
@@ -319,14 +577,23 @@ def fetch_song_sheets_data() -> List[Dict[str, Any]]:
     return all_data
 
 
-def generate_jsonl_content(data: List[Dict[str, Any]]) -> str:
-    """Generate JSONL content from a list of data objects."""
-    content_io = io.StringIO()
+def generate_jsonl_content(data: List[Dict[str, Any]]) -> Tuple[bytes, bytes]:
+    """Generate JSONL content bytes and their md5 digest in a single pass.
+
+    The digest is computed while serializing so the unchanged-content check
+    never needs a second pass over the output.
+    """
+    # orjson serializes compactly (no spaces after separators) at C speed.
+    # OPT_SORT_KEYS canonicalizes key order during serialization, so records
+    # whose dicts were built in different orders still produce stable bytes.
+    digest = hashlib.md5()
+    lines = []
     for item in data:
-        content_io.write(json.dumps(item, separators=(",", ":")) + "\n")
-    content = content_io.getvalue()
-    content_io.close()
-    return content
+        line = orjson.dumps(item, option=orjson.OPT_SORT_KEYS) + b"\n"
+        digest.update(line)
+        lines.append(line)
+    # bytes.join preallocates the exact final length — one copy, no resizes.
+    return b"".join(lines), digest.digest()
 
 
 @click.command()
@@ -367,27 +634,84 @@ def main(dataset: str, output: tuple):
         print("No data to sync. Exiting.")
         return
     
-    # Generate JSONL content
-    content = generate_jsonl_content(data)
+    # Generate JSONL content (and its md5, used for the unchanged check)
+    content, content_md5 = generate_jsonl_content(data)
     
     # Initialize output writer
     writer = OutputWriter()
 
-    # Write to all specified outputs
-    synced_count = 0
+    # Decide which destinations actually need new content. For GCS this is an
+    # md5 check against object metadata rather than a full download; for
+    # local files the existing copy is hashed in chunks, never slurped.
+    pending: List[str] = []
+    gcs_source: Optional[str] = None
     for output_path in output_paths:
-        # Check if we should skip writing for this path
-        existing_content = writer.read_content(output_path)
-        if existing_content is not None and content == existing_content:
+        is_gcs = output_path.startswith("gs://")
+        if is_gcs:
+            unchanged = writer.remote_md5(output_path) == content_md5
+        else:
+            unchanged = writer.local_md5(output_path) == content_md5
+        if unchanged:
             print(f"Content for {output_path} is unchanged. Skipping write.")
+            if is_gcs and gcs_source is None:
+                # The remote object already holds the new content, so it can
+                # serve as the copy source for the other GCS destinations.
+                gcs_source = output_path
             continue
+        pending.append(output_path)
+
+    # The content is uploaded to GCS at most once; the other GCS destinations
+    # are filled by server-side copy, a metadata operation that re-sends no
+    # bytes. Local writes and the single upload are independent, so they run
+    # concurrently, as do the copies once their source object exists.
+    upload_target: Optional[str] = None
+    if gcs_source is None:
+        upload_target = next((p for p in pending if p.startswith("gs://")), None)
+    copy_targets = [
+        p for p in pending if p.startswith("gs://") and p != upload_target
+    ]
+    direct_targets = [p for p in pending if not p.startswith("gs://")]
+    if upload_target:
+        direct_targets.append(upload_target)
 
+    def sync_one(path: str, copy_from: Optional[str] = None) -> bool:
         try:
-            writer.write_content(content, output_path)
-            synced_count += 1
+            if copy_from is not None:
+                writer.copy_content(copy_from, path)
+            else:
+                writer.write_content(content, path)
+            return True
         except Exception as e:
-            print(f"ERROR: Failed to write to {output_path}: {e}", file=sys.stderr)
-            sys.exit(1)
+            print(f"ERROR: Failed to write to {path}: {e}", file=sys.stderr)
+            return False
+
+    synced_count = 0
+    failed = False
+    if direct_targets:
+        with ThreadPoolExecutor(max_workers=len(direct_targets)) as executor:
+            results = dict(zip(direct_targets, executor.map(sync_one, direct_targets)))
+        synced_count += sum(results.values())
+        failed = not all(results.values())
+        # Only the upload's own outcome decides whether it can serve as the
+        # copy source — a failed local write must not block the server-side
+        # copies when the upload itself succeeded.
+        if upload_target is not None and results[upload_target]:
+            gcs_source = upload_target
+
+    if copy_targets:
+        if gcs_source is None:
+            # The upload failed, so there is nothing to copy from.
+            failed = True
+        else:
+            with ThreadPoolExecutor(max_workers=len(copy_targets)) as executor:
+                results = list(
+                    executor.map(lambda p: sync_one(p, copy_from=gcs_source), copy_targets)
+                )
+            synced_count += sum(results)
+            failed = failed or not all(results)
+
+    if failed:
+        sys.exit(1)
 
     print(f"Successfully synced {dataset} dataset to {synced_count} of {len(output_paths)} destination(s)")
 
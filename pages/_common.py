@@ -0,0 +1,53 @@
+"""Shared data-loading helpers for the Streamlit pages.
+
+Each page used to carry its own copy of the download-and-parse loop. Keeping
+a single cached loader here means a dataset is downloaded and parsed at most
+once per TTL window for the whole app, no matter how many pages use it.
+"""
+
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+import orjson
+import streamlit as st
+
+SONG_SHEETS_URL = "https://ukulele-tuesday-datasets.storage.googleapis.com/song-sheets/aggregated/latest/data.jsonl"
+JAM_SESSIONS_URL = "https://ukulele-tuesday-datasets.storage.googleapis.com/jam-sessions/latest/data.jsonl"
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def load_jsonl_records(dataset_url: str, dataset_name: str) -> Optional[List[Dict[str, Any]]]:
+    """Download and parse a JSONL dataset from a public URL.
+
+    Returns a list of record dicts, or None on failure (after surfacing the
+    error in the UI). Invalid lines are skipped with a warning.
+    """
+    try:
+        with urllib.request.urlopen(dataset_url) as response:
+            if response.status != 200:
+                st.error(f"Failed to fetch {dataset_name} data: HTTP {response.status}")
+                return None
+            raw = response.read()
+    except Exception as e:
+        st.error(f"Error loading {dataset_name} data from public URL: {e}")
+        return None
+
+    # Read the body in one go and parse per line: one C-level orjson call
+    # per record, without the HTTP response's per-line iterator overhead.
+    lines = [line for line in raw.splitlines() if line.strip()]
+    try:
+        all_data: List[Dict[str, Any]] = [orjson.loads(line) for line in lines]
+    except orjson.JSONDecodeError:
+        # Fall back to per-line parsing only when the batch parse hits a bad
+        # line, so the good records are still kept.
+        all_data = []
+        for line in lines:
+            try:
+                all_data.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
+                st.warning(f"Skipping invalid JSON line in {dataset_name} dataset")
+
+    if not all_data:
+        st.error(f"No data found in the {dataset_name} dataset file.")
+        return None
+    return all_data
@@ -1,40 +1,21 @@
-import json
+import numpy as np
 import pandas as pd
 import streamlit as st
-import urllib.request
 import altair as alt
-import difflib
+from rapidfuzz import fuzz, process
 from typing import List, Dict, Any, Optional
 
-@st.cache_data(ttl=600)
+from pages._common import JAM_SESSIONS_URL, SONG_SHEETS_URL, load_jsonl_records
+
+
 def load_data_from_public_url() -> Optional[pd.DataFrame]:
     """Load and preprocess the jam sessions dataset from a public URL."""
-    dataset_url = "https://ukulele-tuesday-datasets.storage.googleapis.com/jam-sessions/latest/data.jsonl"
-    all_data: List[Dict[str, Any]] = []
+    with st.spinner("Loading jam sessions dataset..."):
+        all_data = load_jsonl_records(JAM_SESSIONS_URL, "jam-sessions")
 
-    try:
-        with st.spinner("Loading jam sessions dataset..."):
-            with urllib.request.urlopen(dataset_url) as response:
-                if response.status != 200:
-                    st.error(f"Failed to fetch data: HTTP {response.status}")
-                    return None
-                for line in response:
-                    try:
-                        all_data.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        st.warning(f"Skipping invalid JSON line: {line.strip()}")
-                        continue
-
-        if not all_data:
-            st.error("No data found in the dataset file.")
-            return None
-
-        df = pd.DataFrame(all_data)
-        return df
-
-    except Exception as e:
-        st.error(f"Error loading data from public URL: {e}")
+    if all_data is None:
         return None
+    return pd.DataFrame(all_data)
 
 
 def normalize_for_matching(text: str) -> str:
@@ -47,112 +28,128 @@ def normalize_for_matching(text: str) -> str:
     return text.strip().lower()
 
 
-@st.cache_data(ttl=600)
 def load_song_sheets_data() -> Optional[List[Dict[str, Any]]]:
     """Load the canonical song sheets dataset from a public URL."""
-    dataset_url = "https://ukulele-tuesday-datasets.storage.googleapis.com/song-sheets/aggregated/latest/data.jsonl"
+    records = load_jsonl_records(SONG_SHEETS_URL, "song-sheets")
+    if records is None:
+        return None
+
+    # Extract the relevant fields for matching
     all_data: List[Dict[str, Any]] = []
+    for song_data in records:
+        properties = song_data.get('properties', {})
+        all_data.append({
+            'id': song_data.get('id'),
+            'song': properties.get('song'),
+            'artist': properties.get('artist'),
+            'specialbooks': properties.get('specialbooks'),
+        })
 
-    try:
-        with urllib.request.urlopen(dataset_url) as response:
-            if response.status != 200:
-                return None
-            for line in response:
-                try:
-                    song_data = json.loads(line)
-                    # Extract the relevant fields for matching
-                    all_data.append({
-                        'id': song_data.get('id'),
-                        'song': song_data.get('properties', {}).get('song'),
-                        'artist': song_data.get('properties', {}).get('artist'),
-                        'specialbooks': song_data.get('properties', {}).get('specialbooks'),
-                    })
-                except json.JSONDecodeError:
-                    continue
-
-        # Filter out any incomplete entries
-        all_data = [s for s in all_data if s.get('id') and s.get('song') and s.get('artist')]
-        return all_data if all_data else None
-
-    except Exception as e:
-        st.error(f"Error loading data from public URL: {e}")
-        return None
+    # Filter out any incomplete entries
+    all_data = [s for s in all_data if s.get('id') and s.get('song') and s.get('artist')]
+    return all_data if all_data else None
 
 
 def sanitize_jam_events(events_df, canonical_songs: List[Dict[str, Any]]) -> pd.DataFrame:
     """
-    Sanitize jam session events by matching to canonical song sheets using difflib.
+    Sanitize jam session events by matching to canonical song sheets using
+    fuzzy string matching.
     Shows warnings for unmatched entries and removes invalid entries from the dataset.
+
+    Mutates events_df in place; callers should use only the returned,
+    filtered frame.
     """
     if not canonical_songs:
         return events_df
 
-    # Create a copy to avoid modifying the original
-    sanitized_df = events_df.copy()
+    # The only call site hands over its frame and keeps just the return
+    # value, so there is no need to clone the page's largest frame here.
+    sanitized_df = events_df
 
-    # Ensure the 'specialbooks' column exists and can hold lists
+    # Ensure the 'specialbooks' column exists
     if 'specialbooks' not in sanitized_df.columns:
         sanitized_df['specialbooks'] = pd.Series(dtype='object')
 
 
-    # Build canonical keys
-    canonical_keys = []
-    canonical_data = []
-    for song_data in canonical_songs:
-        key = f"{song_data['song']} - {song_data['artist']}"
-        canonical_keys.append(normalize_for_matching(key))
-        canonical_data.append(song_data)
-
-    # Track indices to remove and unmatched songs
-    indices_to_remove = []
+    # Build canonical keys plus per-field arrays: the writeback below then
+    # becomes three fancy-indexed lookups instead of walking the dicts again
+    # per matched row.
+    canonical_keys = [
+        normalize_for_matching(f"{s['song']} - {s['artist']}") for s in canonical_songs
+    ]
+    canonical_by_key = {key: i for i, key in enumerate(canonical_keys)}
+    canonical_song_arr = np.array([s['song'] for s in canonical_songs], dtype=object)
+    canonical_artist_arr = np.array([s['artist'] for s in canonical_songs], dtype=object)
+    canonical_specialbooks_arr = np.array(
+        [s.get('specialbooks') for s in canonical_songs], dtype=object
+    )
+
+    # Track unmatched songs
     unmatched_songs = set()
 
     # Only process song events
     song_mask = sanitized_df['type'] == 'song'
 
-    for idx in sanitized_df[song_mask].index:
-        jam_song = sanitized_df.at[idx, 'song']
-        jam_artist = sanitized_df.at[idx, 'artist']
-
-        # Mark for removal if song or artist is None, NaN, empty, or just whitespace/dashes
-        if pd.isna(jam_song) or pd.isna(jam_artist):
-            indices_to_remove.append(idx)
-            continue
-
-        # Convert to strings and strip whitespace
-        jam_song_str = str(jam_song).strip()
-        jam_artist_str = str(jam_artist).strip()
-
-        # Mark for removal if either is empty or just a dash
-        if not jam_song_str or not jam_artist_str or jam_song_str == '-' or jam_artist_str == '-':
-            indices_to_remove.append(idx)
-            continue
-
-        # Create search key
-        jam_key = normalize_for_matching(f"{jam_song_str} - {jam_artist_str}")
-
-        # Use difflib to find close matches
-        matches = difflib.get_close_matches(jam_key, canonical_keys, n=1, cutoff=0.8)
-
-        if matches:
-            # Find the matched canonical data
-            match_index = canonical_keys.index(matches[0])
-            matched_data = canonical_data[match_index]
-
-            # Replace with canonical names
-            sanitized_df.at[idx, 'song'] = matched_data['song']
-            sanitized_df.at[idx, 'artist'] = matched_data['artist']
-            
-            # Carry over specialbooks data
-            specialbooks = matched_data.get('specialbooks')
-            if isinstance(specialbooks, str):
-                sanitized_df.at[idx, 'specialbooks'] = specialbooks.split(',')
-            else:
-                sanitized_df.at[idx, 'specialbooks'] = specialbooks
-        else:
-            # Mark for removal and record the unmatched entry
-            unmatched_songs.add(f"{jam_song_str} - {jam_artist_str}")
-            indices_to_remove.append(idx)
+    # Vectorized pre-clean: strip both columns once and build the search
+    # keys as whole-column string ops, instead of reading each cell with
+    # .at and re-checking NaN/empty/dash per row.
+    songs = sanitized_df.loc[song_mask, 'song'].astype('string').str.strip()
+    artists = sanitized_df.loc[song_mask, 'artist'].astype('string').str.strip()
+    valid = (
+        songs.notna() & artists.notna()
+        & (songs != '') & (artists != '')
+        & (songs != '-') & (artists != '-')
+    )
+    jam_keys = (songs + ' - ' + artists).str.lower()
+
+    # Song rows that fail validation are dropped outright.
+    indices_to_remove = list(valid.index[~valid])
+
+    queries = jam_keys[valid]
+    if not queries.empty:
+        # Exact matches on the normalized key bypass fuzzy scoring entirely
+        # — typically the bulk of the rows once a song is in the songbook.
+        exact = queries.map(canonical_by_key)
+        exact_hit = exact.notna()
+
+        matched_idx = queries.index[exact_hit]
+        matched_best = exact[exact_hit].astype(int).to_numpy()
+
+        fuzzy_queries = queries[~exact_hit]
+        if not fuzzy_queries.empty:
+            # Score the residual queries against all canonical keys in one
+            # C call. fuzz.ratio is the same normalized-similarity metric
+            # difflib used (cutoff 0.8 == 80); score_cutoff zeroes anything
+            # below it, so a best score of 0 means no acceptable match.
+            # workers=-1 spreads the matrix across cores.
+            scores = process.cdist(
+                fuzzy_queries.tolist(),
+                canonical_keys,
+                scorer=fuzz.ratio,
+                score_cutoff=80,
+                workers=-1,
+                dtype=np.uint8,
+            )
+            best = scores.argmax(axis=1)
+            best_score = scores[np.arange(len(best)), best]
+
+            fuzzy_hit = best_score > 0
+            matched_idx = matched_idx.append(fuzzy_queries.index[fuzzy_hit])
+            matched_best = np.concatenate([matched_best, best[fuzzy_hit]])
+            unmatched_idx = fuzzy_queries.index[~fuzzy_hit]
+
+            # Record the unmatched entries and mark them for removal
+            unmatched_songs.update(songs.loc[unmatched_idx] + " - " + artists.loc[unmatched_idx])
+            indices_to_remove.extend(unmatched_idx)
+
+        # Replace with canonical names and carry over specialbooks data in
+        # three column assignments instead of three .at writes per row.
+        # specialbooks keeps the canonical comma-joined string so songbook
+        # membership downstream is a vectorized string match, not a per-row
+        # list check.
+        sanitized_df.loc[matched_idx, 'song'] = canonical_song_arr[matched_best]
+        sanitized_df.loc[matched_idx, 'artist'] = canonical_artist_arr[matched_best]
+        sanitized_df.loc[matched_idx, 'specialbooks'] = canonical_specialbooks_arr[matched_best]
 
     # Remove invalid entries
     if indices_to_remove:
@@ -166,60 +163,104 @@ def sanitize_jam_events(events_df, canonical_songs: List[Dict[str, Any]]) -> pd.
     return sanitized_df
 
 
+@st.cache_data(ttl=600, show_spinner=False)
+def build_songs_df():
+    """Explode, normalize, and sanitize the full jam-sessions dataset once.
+
+    Returns (sessions_df, songs_df). The heavy transforms here depend only on
+    the raw dataset, not on the date-range selection, so caching them means a
+    dropdown change costs one boolean mask instead of a full rebuild.
+    """
+    df = load_data_from_public_url()
+    if df is None:
+        return None, None
+
+    df["date"] = pd.to_datetime(df["date"])
+
+    # Create year and year-month columns
+    df["year"] = df["date"].dt.year
+    df["year_month"] = df["date"].dt.to_period("M").astype(str)
+
+    # Explode the 'events' column to get one row per event
+    events_df = df.explode("events").reset_index(drop=True)
+    # Normalize the 'events' column, which contains dicts. One DataFrame
+    # constructor over the list of dicts beats apply(pd.Series), which
+    # builds a throwaway Series per row. Sessions with an empty events
+    # list explode to NaN, which the constructor can't iterate — map
+    # those to empty dicts so they become all-NaN rows as before.
+    events_expanded = pd.DataFrame(
+        [e if isinstance(e, dict) else {} for e in events_df["events"]],
+        index=events_df.index,
+    )
+    events_df = events_df.drop(columns=['events']).join(events_expanded)
+
+    # Sanitize song and artist names using canonical data
+    canonical_songs = load_song_sheets_data()
+    if canonical_songs:
+        events_df = sanitize_jam_events(events_df, canonical_songs)
+
+    # Filter for song events
+    songs_df = events_df[events_df['type'] == 'song'].copy()
+
+    # Add a column to indicate if a song is in the current songbook.
+    # specialbooks is the canonical comma-joined string, so membership is a
+    # single vectorized match anchored on the separators.
+    songs_df['in_current_songbook'] = songs_df["specialbooks"].str.contains(
+        r"(?:^|,)regular(?:,|$)", regex=True, na=False
+    )
+
+    # Create a unique song identifier (song + artist); str.cat is a single
+    # vectorized pass over both columns. Stored as a categorical so the
+    # groupby/value_counts passes below run over int32 codes instead of
+    # re-hashing the strings on every rerun.
+    songs_df['song_artist'] = songs_df['song'].str.cat(songs_df['artist'], sep=' - ').astype('category')
+
+    # Keep both frames sorted by date so the date-range selector in main()
+    # can slice with searchsorted (O(log N) + a view) instead of evaluating
+    # a boolean mask over every row per interaction.
+    df = df.sort_values("date", kind="stable").reset_index(drop=True)
+    songs_df = songs_df.sort_values("date", kind="stable").reset_index(drop=True)
+
+    return df, songs_df
+
+
 def main():
     st.set_page_config(page_title="Ukulele Tuesday Song Popularity", layout="wide", page_icon="⭐")
     st.title("Ukulele Tuesday Song Popularity")
 
-    df = load_data_from_public_url()
+    df, songs_df = build_songs_df()
 
     if df is not None:
-        df["date"] = pd.to_datetime(df["date"])
-
-        # Create year and year-month columns
-        df["year"] = df["date"].dt.year
-        df["year_month"] = df["date"].dt.to_period("M").astype(str)
-
         # Generate dropdown options
         years = sorted(df["year"].unique(), reverse=True)
         date_range_options = ["Last 12 months"] + [str(y) for y in years] + ["All time"]
-        
+
         # Date range dropdown
         selected_range = st.selectbox(
             "Select date range",
             options=date_range_options,
             index=0  # Default to "Last 12 months"
         )
-        
-        # Filter dataframe based on selection
+
+        # Filter both frames based on selection — a plain boolean mask, the
+        # expensive transforms happened once inside build_songs_df.
         end_date = df["date"].max().date()
-        
+
         if selected_range == "Last 12 months":
-            start_date = end_date - pd.DateOffset(months=12)
-            df = df[df["date"] >= pd.to_datetime(start_date)]
+            start_ts = pd.to_datetime(end_date - pd.DateOffset(months=12))
+            df = df.iloc[df["date"].searchsorted(start_ts):]
+            songs_df = songs_df.iloc[songs_df["date"].searchsorted(start_ts):]
         elif selected_range == "All time":
             pass  # No date filter needed
         else:
-            # Filter by selected year
+            # Filter by selected year: dates are sorted, so the year's rows
+            # are the contiguous slice [Jan 1, next Jan 1).
             selected_year = int(selected_range)
-            df = df[df["year"] == selected_year]
-
-        # Explode the 'events' column to get one row per event
-        events_df = df.explode("events").reset_index(drop=True)
-        # Normalize the 'events' column, which contains dicts
-        events_df = pd.concat([events_df.drop(['events'], axis=1), events_df['events'].apply(pd.Series)], axis=1)
-
-        # Sanitize song and artist names using canonical data
-        canonical_songs = load_song_sheets_data()
-        if canonical_songs:
-            events_df = sanitize_jam_events(events_df, canonical_songs)
-
-        # Filter for song events
-        songs_df = events_df[events_df['type'] == 'song'].copy()
-
-        # Add a column to indicate if a song is in the current songbook
-        songs_df['in_current_songbook'] = songs_df["specialbooks"].apply(
-            lambda x: isinstance(x, list) and "regular" in x
-        )
+            bounds = [pd.Timestamp(selected_year, 1, 1), pd.Timestamp(selected_year + 1, 1, 1)]
+            lo, hi = df["date"].searchsorted(bounds)
+            df = df.iloc[lo:hi]
+            lo, hi = songs_df["date"].searchsorted(bounds)
+            songs_df = songs_df.iloc[lo:hi]
 
         st.header("Overall Summary")
         col1, col2, col3 = st.columns(3)
@@ -229,11 +270,10 @@ def main():
 
         st.header("Most Played Songs")
 
-        # Create a unique song identifier (song + artist)
-        songs_df['song_artist'] = songs_df['song'] + " - " + songs_df['artist']
-
-        # Group by song and get play count and songbook status
-        song_counts = songs_df.groupby('song_artist').agg(
+        # Group by song and get play count and songbook status. observed=True
+        # keeps categories filtered out by the date range from showing up as
+        # zero-play rows; the frequency sort happens below anyway.
+        song_counts = songs_df.groupby('song_artist', observed=True, sort=False).agg(
             Plays=('song_artist', 'size'),
             in_current_songbook=('in_current_songbook', 'first')
         ).sort_values(by='Plays', ascending=False).reset_index()
@@ -286,19 +326,22 @@ def main():
         sessions_past_count = df[(df['date'] > period_start) & (df['date'] <= period_midpoint)]['session_id'].nunique()
 
         if sessions_recent_count > 0 and sessions_past_count > 0:
-            # Calculate frequencies
-            freq_recent = (recent_songs['song_artist'].value_counts() / sessions_recent_count).reset_index()
-            freq_recent.columns = ['song_artist', 'recent_freq']
+            # Calculate frequencies. value_counts on a categorical reports
+            # every category, so drop the zero-count ones to keep only songs
+            # actually played in each window.
+            freq_recent = recent_songs['song_artist'].value_counts() / sessions_recent_count
+            freq_recent = freq_recent[freq_recent > 0]
 
-            freq_past = (past_songs['song_artist'].value_counts() / sessions_past_count).reset_index()
-            freq_past.columns = ['song_artist', 'past_freq']
+            freq_past = past_songs['song_artist'].value_counts() / sessions_past_count
+            freq_past = freq_past[freq_past > 0]
 
-            # Merge and calculate change
-            trends_df = pd.merge(freq_recent, freq_past, on='song_artist', how='outer').fillna(0)
-            trends_df['change'] = trends_df['recent_freq'] - trends_df['past_freq']
+            # Series subtraction aligns on the song index, so no
+            # merge/fillna/reset_index round-trip is needed; songs missing
+            # from one window count as zero there.
+            change = freq_recent.sub(freq_past, fill_value=0)
 
             # Rising Stars
-            rising_stars = trends_df.nlargest(10, 'change')
+            rising_stars = change.nlargest(10).rename_axis('song_artist').reset_index(name='change')
             st.markdown("##### Biggest Rising Stars")
             st.caption(f"Songs played more frequently in the last 12 months compared to the 12 months prior.")
 
@@ -310,7 +353,7 @@ def main():
             st.altair_chart(rising_chart, use_container_width=True)
 
             # Falls from Grace
-            falling_stars = trends_df.nsmallest(10, 'change')
+            falling_stars = change.nsmallest(10).rename_axis('song_artist').reset_index(name='change')
             st.markdown("##### Biggest Falls from Grace")
             st.caption(f"Songs played less frequently in the last 12 months compared to the 12 months prior.")
 
@@ -1,53 +1,34 @@
 import altair as alt
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import streamlit as st
-import json
-import urllib.request
+
+from pages._common import SONG_SHEETS_URL, load_jsonl_records
 
 
-@st.cache_data(ttl=600)
 def load_data_from_public_url():
     """Load and preprocess the song sheets dataset from a public URL."""
-    dataset_url = "https://ukulele-tuesday-datasets.storage.googleapis.com/song-sheets/aggregated/latest/data.jsonl"
-    all_data = []
-
-    try:
-        with st.spinner("Loading aggregated dataset..."):
-            with urllib.request.urlopen(dataset_url) as response:
-                if response.status != 200:
-                    st.error(f"Failed to fetch data: HTTP {response.status}")
-                    return None
-                for line in response:
-                    try:
-                        all_data.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        st.warning(f"Skipping invalid JSON line: {line.strip()}")
-                        continue
-
-        if not all_data:
-            st.error("No data found in the dataset file.")
-            return None
-
-        df = pd.DataFrame(all_data)
-        st.success(f"Successfully loaded {len(all_data)} songs")
-        return df
-
-    except Exception as e:
-        st.error(f"Error loading data from public URL: {e}")
+    with st.spinner("Loading aggregated dataset..."):
+        all_data = load_jsonl_records(SONG_SHEETS_URL, "song-sheets")
+
+    if all_data is None:
         return None
 
+    # Flatten the nested properties dict in one pass (dict.update/pop are
+    # C-implemented), so no json_normalize + concat round-trip is needed.
+    for record in all_data:
+        record.update(record.pop("properties", {}) or {})
 
+    df = pd.DataFrame.from_records(all_data)
+    st.success(f"Successfully loaded {len(all_data)} songs")
+    return df
 
 
 
-def process_dataframe(df):
-    """Process and clean the dataframe."""
-    # Use json_normalize to flatten the 'properties' column
-    properties_df = pd.json_normalize(df["properties"])
-    # Concatenate the flattened properties with the original dataframe (id and name)
-    df = pd.concat([df.drop("properties", axis=1), properties_df], axis=1)
 
+
+def process_dataframe(df):
+    """Process and clean the dataframe (properties are already flattened)."""
     # Drop mimeType and parents if they exist, ignoring errors if not
     df = df.drop(columns=["mimeType", "parents"], errors="ignore")
 
@@ -61,9 +42,44 @@ def process_dataframe(df):
     df["specialbooks"] = df["specialbooks"].str.split(",")
     df["chords"] = df["chords"].str.split(",")
 
+    # Precompute the current-songbook membership once (this function runs
+    # inside the cached loader); filtering is then a plain boolean mask
+    # instead of a per-row Python callback on every rerun.
+    df["is_regular"] = df["specialbooks"].apply(
+        lambda x: isinstance(x, list) and "regular" in x
+    )
+
+    # Low-cardinality strings become categoricals (count/unique ops work on
+    # small integer codes instead of hashing Python strings) and numerics get
+    # the smallest dtype that fits, shrinking the cached frame and the Arrow
+    # payload Streamlit ships to the browser.
+    for col in ("artist", "tabber", "gender"):
+        df[col] = df[col].astype("category")
+    df["difficulty"] = df["difficulty"].astype("float32")
+    df["year"] = df["year"].astype("Int16")
+
+    # Derived chart columns are deterministic functions of the raw frame, so
+    # compute them once here (inside the cached loader) rather than on every
+    # rerun. Decade bucketing is vectorized: integer arithmetic + np.where
+    # instead of a per-row Python function.
+    valid_year = df["year"].notna()
+    years = df.loc[valid_year, "year"].to_numpy(dtype=np.int64)
+    labels = np.where(
+        years < 1950, "<1950", np.char.add(((years // 10) * 10).astype(str), "s")
+    )
+    decade_order = sorted({label for label in labels if label != "<1950"})
+    if "<1950" in labels:
+        decade_order.insert(0, "<1950")
+    decade = pd.Series(pd.NA, index=df.index, dtype="object")
+    decade.loc[valid_year] = labels
+    df["decade"] = pd.Categorical(decade, categories=decade_order, ordered=True)
+
+    df["difficulty_int"] = df["difficulty"].round(0).astype("Int16")
+
     return df
 
 
+@st.cache_data(ttl=600, show_spinner=False)
 def load_data():
     """Load song sheets dataset from public URL."""
     # Load from public URL
@@ -78,6 +94,71 @@ def load_data():
 
 
 
+@st.cache_data(ttl=600)
+def compute_aggregates(_df, song_filter):
+    """Precompute every chart aggregate for a filter selection.
+
+    _df is excluded from the cache key (leading underscore): it is the
+    deterministic product of the cached load_data within the same TTL window,
+    so keying on the filter alone avoids hashing the whole frame per rerun.
+    The aggregates are a few KB, vs. the MB-sized raw frame.
+    """
+    df = _df
+
+    # value_counts already sorts descending by count; no extra sort needed.
+    tabber_counts = df["tabber"].value_counts()
+
+    df_by_date = df.dropna(subset=["date"]).sort_values("date")
+    # np.arange writes the column directly as int32 — no per-element Python
+    # int boxing, and half the bytes of the inferred int64.
+    df_by_date["cumulative_songs"] = np.arange(1, len(df_by_date) + 1, dtype=np.int32)
+    cumulative_songs = df_by_date.set_index("date")["cumulative_songs"]
+
+    # decade and difficulty_int are precomputed in process_dataframe, so
+    # aggregation here is a pure value_counts. sort=False skips the
+    # by-frequency sort since the result is re-sorted by index anyway, and
+    # remove_unused_categories keeps zero-count decades out of the chart
+    # when the frame has been filtered.
+    decade_counts = (
+        df["decade"].cat.remove_unused_categories().value_counts(sort=False).sort_index()
+    )
+
+    difficulty_counts = df["difficulty_int"].value_counts(sort=False).sort_index()
+
+    # explode + value_counts stays in C, with no intermediate Python list
+    # of every chord occurrence.
+    chord_counts = (
+        df["chords"].dropna().explode().value_counts().rename_axis("chord").reset_index(name="count")
+    )
+
+    gender_counts = df["gender"].value_counts().reset_index()
+    gender_counts.columns = ["gender", "count"]
+
+    return {
+        "tabber_counts": tabber_counts,
+        "cumulative_songs": cumulative_songs,
+        "decade_counts": decade_counts,
+        "difficulty_counts": difficulty_counts,
+        "chord_counts": chord_counts,
+        "gender_counts": gender_counts,
+    }
+
+
+@st.cache_resource
+def build_gender_pie(labels, counts):
+    """Build the gender pie figure once per distribution.
+
+    Keyed on plain tuples so the cache lookup is cheap; constructing and
+    serializing a Plotly figure per rerun is not. Plotly is imported lazily
+    here so the other pages (and cache-hit reruns) never pay its import cost.
+    """
+    import plotly.express as px
+
+    return px.pie(
+        values=list(counts), names=list(labels), title="Gender Distribution"
+    )
+
+
 def main():
     st.set_page_config(page_title="Ukulele Tuesday Song Stats", layout="wide")
     st.title("Ukulele Tuesday Song Sheets Dashboard")
@@ -115,11 +196,11 @@ def main():
         st.query_params["songs"] = song_filter_options[song_filter]
 
         if song_filter == "Current edition":
-            df = df[
-                df["specialbooks"].apply(
-                    lambda x: isinstance(x, list) and "regular" in x
-                )
-            ]
+            df = df[df["is_regular"]]
+            # Drop categories that only occur outside the current edition so
+            # the charts below don't render zero-count bars for them.
+            for col in ("artist", "tabber", "gender"):
+                df[col] = df[col].cat.remove_unused_categories()
 
         st.header("Dataset Overview")
         col1, col2, col3 = st.columns(3)
@@ -129,54 +210,27 @@ def main():
 
         st.header("Analysis")
 
+        aggregates = compute_aggregates(df, song_filter_options[song_filter])
+
         # Songs per tabber
         st.subheader("Songs per Tabber")
-        tabber_counts = df["tabber"].value_counts().sort_values(ascending=False)
-        st.bar_chart(tabber_counts)
+        st.bar_chart(aggregates["tabber_counts"])
 
         # Total songs over time
         st.subheader("Total Songs Over Time")
-        df_by_date = df.dropna(subset=["date"]).sort_values("date")
-        # Create a column for cumulative song count
-        df_by_date["cumulative_songs"] = range(1, len(df_by_date) + 1)
-        st.line_chart(df_by_date.set_index("date")["cumulative_songs"])
+        st.line_chart(aggregates["cumulative_songs"])
 
         # Songs by decade of release
         st.subheader("Song Distribution by Decade of Release")
-        df_with_year = df.dropna(subset=["year"]).copy()
-
-        def map_year_to_decade(year):
-            year = int(year)
-            if year < 1950:
-                return "<1950"
-            return f"{(year // 10) * 10}s"
-
-        df_with_year["decade"] = df_with_year["year"].apply(map_year_to_decade)
-
-        # Define the chronological order of decades
-        decade_order = sorted([d for d in df_with_year["decade"].unique() if d != '<1950'])
-        if '<1950' in df_with_year["decade"].unique():
-            decade_order.insert(0, '<1950')
-
-        # Convert to categorical type to enforce order
-        df_with_year["decade"] = pd.Categorical(df_with_year["decade"], categories=decade_order, ordered=True)
-
-        decade_counts = df_with_year["decade"].value_counts().sort_index()
-        st.bar_chart(decade_counts)
+        st.bar_chart(aggregates["decade_counts"])
 
         # Difficulty distribution
         st.subheader("Difficulty Distribution")
-        # Round difficulty to nearest integer for grouping, then count and sort.
-        difficulty_groups = df["difficulty"].dropna().round(0).astype(int)
-        st.bar_chart(difficulty_groups.value_counts().sort_index())
+        st.bar_chart(aggregates["difficulty_counts"])
 
         # Most common chords
         st.subheader("Most Common Chords")
-        all_chords = [
-            chord for sublist in df["chords"].dropna() for chord in sublist
-        ]
-        chord_counts = pd.Series(all_chords).value_counts().reset_index()
-        chord_counts.columns = ["chord", "count"]
+        chord_counts = aggregates["chord_counts"]
 
         chart = (
             alt.Chart(chord_counts)
@@ -192,24 +246,30 @@ def main():
 
         # Gender distribution
         st.subheader("Gender Distribution")
-        gender_counts = df["gender"].value_counts().reset_index()
-        gender_counts.columns = ["gender", "count"]
-        fig = px.pie(
-            gender_counts, values="count", names="gender", title="Gender Distribution"
+        gender_counts = aggregates["gender_counts"]
+        fig = build_gender_pie(
+            tuple(gender_counts["gender"]), tuple(gender_counts["count"])
         )
         st.plotly_chart(fig, use_container_width=True)
 
         st.header("Raw Data")
-        st.dataframe(df.drop("id", axis=1))
+        # Column selection is cheaper than drop() (no frame copy per rerun)
+        # and also hides the derived helper columns from the raw view.
+        display_cols = [
+            col
+            for col in df.columns
+            if col not in ("id", "is_regular", "decade", "difficulty_int")
+        ]
+        st.dataframe(df[display_cols])
 
         st.subheader("Data Quality Check")
         # List of columns that are allowed to have missing values
         optional_cols = ["features", "song_title"]
         # Columns to check for missing values are all columns except the optional ones
-        cols_to_check = [col for col in df.columns if col not in optional_cols]
+        cols_to_check = [col for col in display_cols if col not in optional_cols]
         missing_data_df = df[df[cols_to_check].isna().any(axis=1)]
         st.write("Songs with one or more missing required fields:")
-        st.dataframe(missing_data_df.drop("id", axis=1))
+        st.dataframe(missing_data_df[display_cols])
 
         st.markdown("---")
         st.markdown(
@@ -5,7 +5,7 @@
 # dependencies = [
 #   "jsonschema",
 #   "click",
-#   "pandas"
+#   "orjson"
 # ]
 # ///
 
@@ -15,23 +15,27 @@ Dataset validation script for Ukulele Tuesday datasets.
 Validates datasets against their corresponding JSON schemas.
 """
 
+import functools
 import json
+import reprlib
 import sys
 from pathlib import Path
 from typing import Dict, Any
 import click
-import pandas as pd
-from jsonschema import validate, ValidationError
+import orjson
+from jsonschema import Draft202012Validator, ValidationError
 
+_SCHEMA_DIR = Path(__file__).resolve().parent / "schemas"
+_SCHEMA_FILES = {
+    "jam-sessions": "sessions.json",
+    "song-sheets": "song-sheets.json"
+}
 
+
+@functools.lru_cache(maxsize=None)
 def load_schema(dataset_type: str) -> Dict[str, Any]:
-    """Load a JSON schema from file."""
-    schema_files = {
-        "jam-sessions": "sessions.json",
-        "song-sheets": "song-sheets.json"
-    }
-    
-    schema_path = Path(__file__).parent / "schemas" / schema_files[dataset_type]
+    """Load a JSON schema from file (cached per dataset type)."""
+    schema_path = _SCHEMA_DIR / _SCHEMA_FILES[dataset_type]
     try:
         with open(schema_path, 'r') as f:
             return json.load(f)
@@ -43,35 +47,57 @@ def load_schema(dataset_type: str) -> Dict[str, Any]:
         sys.exit(1)
 
 
+@functools.lru_cache(maxsize=None)
+def get_validator(dataset_type: str) -> Draft202012Validator:
+    """Return a compiled validator for a dataset type (built once).
+
+    Schema load + validator construction is pure repeated work when the
+    validation functions are called in a loop, so cache it per type.
+    """
+    return Draft202012Validator(load_schema(dataset_type))
+
+
+def _iter_jsonl(dataset_path: Path):
+    """Yield records from a JSONL file one line at a time.
+
+    Streaming keeps peak memory at one record instead of the whole file;
+    the jam-sessions validator consumes records as they are parsed.
+    """
+    try:
+        # 1 MiB buffer: far fewer read syscalls than the default block size
+        # on large files; binary mode already bypasses the UTF-8 decoder.
+        with open(dataset_path, 'rb', buffering=1 << 20) as f:
+            for line in f:
+                # orjson tolerates the trailing newline, so no per-line
+                # strip() allocation is needed; just skip blank lines.
+                if not line.isspace():
+                    yield orjson.loads(line)
+    except FileNotFoundError:
+        print(f"ERROR: Dataset file not found: {dataset_path}")
+        sys.exit(1)
+    except orjson.JSONDecodeError as e:
+        print(f"ERROR: Invalid JSON in dataset file {dataset_path}: {e}")
+        sys.exit(1)
+
+
 def load_dataset(dataset_path: Path) -> Any:
     """Load a dataset from file."""
     try:
         if dataset_path.suffix == '.jsonl':
-            # For JSONL, read line by line to preserve exact JSON values
-            data = []
-            with open(dataset_path, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        data.append(json.loads(line))
-            return data
+            # For JSONL, parse line by line to preserve exact JSON values.
+            # orjson parses the raw bytes directly, with no text decode pass.
+            return _iter_jsonl(dataset_path)
         else:
-            # Use pandas for regular JSON files (for performance with large datasets)
-            try:
-                data = pd.read_json(dataset_path)
-                if isinstance(data, pd.DataFrame):
-                    # Convert back to original JSON structure, handling NaN values
-                    return json.loads(data.to_json(orient='records'))
-                else:
-                    return data
-            except Exception:
-                # Fallback to regular JSON loading if pandas fails
-                with open(dataset_path, 'r') as f:
-                    return json.load(f)
+            # Regular JSON files: one parse of the raw bytes. The old pandas
+            # round-trip (read_json -> to_json -> loads) parsed the data
+            # three times to normalize NaN, which valid JSON can't contain
+            # anyway.
+            with open(dataset_path, 'rb') as f:
+                return orjson.loads(f.read())
     except FileNotFoundError:
         print(f"ERROR: Dataset file not found: {dataset_path}")
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         print(f"ERROR: Invalid JSON in dataset file {dataset_path}: {e}")
         sys.exit(1)
     except Exception as e:
@@ -79,21 +105,30 @@ def load_dataset(dataset_path: Path) -> Any:
         sys.exit(1)
 
 
-def validate_dataset_content(data: Any, schema: Dict[str, Any], dataset_type: str) -> bool:
+def validate_dataset_content(data: Any, dataset_type: str) -> bool:
     """Validate a dataset against its schema."""
+    # The compiled validator is cached per dataset type: jsonschema.validate()
+    # re-checks and re-resolves the schema on every call, which dominates the
+    # per-session loop. Both schemas declare draft 2020-12.
+    validator = get_validator(dataset_type)
     try:
         if dataset_type == "jam-sessions":
-            # Jam sessions data is an array of session objects
-            if isinstance(data, list):
-                for i, session in enumerate(data):
-                    validate(instance=session, schema=schema)
-                print(f"✅ {dataset_type}: Dataset validation passed ({len(data)} sessions)")
-            else:
+            # Jam sessions data is a stream/array of session objects,
+            # validated one at a time so a JSONL file never has to be held
+            # in memory as a whole.
+            if isinstance(data, dict):
                 print("❌ jam-sessions: Expected array of sessions, got single object")
                 return False
+            count = 0
+            for session in data:
+                validator.validate(session)
+                count += 1
+            print(f"✅ {dataset_type}: Dataset validation passed ({count} sessions)")
         else:
             # Song sheets - validate the entire dataset
-            validate(instance=data, schema=schema)
+            if not isinstance(data, (list, dict)):
+                data = list(data)
+            validator.validate(data)
             count = len(data) if isinstance(data, list) else 1
             print(f"✅ {dataset_type}: Dataset validation passed ({count} records)")
         
@@ -113,11 +148,14 @@ def validate_dataset_content(data: Any, schema: Dict[str, Any], dataset_type: st
                     print(f"   Failing item: {json.dumps(failing_item, indent=2)}")
         else:
             if e.instance is not None:
-                # Show a snippet of the failing instance for context
-                instance_str = str(e.instance)
-                if len(instance_str) > 200:
-                    instance_str = instance_str[:200] + "..."
-                print(f"   Instance: {instance_str}")
+                # Show a snippet of the failing instance for context.
+                # reprlib truncates while building, so a megabyte-sized bad
+                # record never gets fully stringified just to be sliced.
+                bounded = reprlib.Repr()
+                bounded.maxstring = 200
+                bounded.maxlist = bounded.maxdict = 5
+                bounded.maxother = 200
+                print(f"   Instance: {bounded.repr(e.instance)}")
         return False
     except Exception as e:
         print(f"❌ {dataset_type}: Unexpected error during validation: {e}")
@@ -136,14 +174,11 @@ def main(dataset: str, file_path: Path):
     """Validate a dataset against its schema."""
     print(f"Validating {dataset} dataset: {file_path}")
     
-    # Load schema
-    schema = load_schema(dataset)
-    
     # Load dataset
     data = load_dataset(file_path)
-    
+
     # Validate
-    if validate_dataset_content(data, schema, dataset):
+    if validate_dataset_content(data, dataset):
         print("🎉 Validation passed!")
         sys.exit(0)
     else: